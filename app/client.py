@@ -1,21 +1,301 @@
+import asyncio
+import atexit
 import os
+from email.utils import formatdate
+from typing import Any, AsyncIterator, Optional
+
+import httpx
+import ijson
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
 from simple_salesforce import Salesforce
+from simple_salesforce.util import exception_handler
 from fastmcp.exceptions import ToolError
+from urllib3.util.retry import Retry
+
+# Read once at import; a missing credential is reported when a tool first needs the client
+_CONSUMER_KEY = os.environ.get('SFDC_CLIENT_ID')
+_CONSUMER_SECRET = os.environ.get('SFDC_CLIENT_SECRET')
+_DOMAIN = os.environ.get('SFDC_DOMAIN', 'organization.my')
+
+_sf_client: Optional["AsyncSalesforce"] = None
+_sf_lock = asyncio.Lock()
+
+
+def _reset_on_unauthorized(response: requests.Response, *args, **kwargs) -> None:
+    """Drop the cached client when Salesforce rejects its access token."""
+    global _sf_client
+    if response.status_code == 401:
+        _sf_client = None
+
+
+# Long-lived session so every Salesforce call reuses pooled keep-alive connections
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    ),
+))
+# Re-authenticate on the next call once the access token is rejected
+_session.hooks['response'].append(_reset_on_unauthorized)
+atexit.register(_session.close)
+
+# Async counterpart of _session used for REST calls made from tool handlers
+_http = httpx.AsyncClient(
+    transport=httpx.AsyncHTTPTransport(
+        retries=3,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+    ),
+    timeout=httpx.Timeout(120.0, connect=10.0),
+)
+# The transport only retries failed connections, so transient error statuses are retried in
+# AsyncSalesforce._send, matching the Retry policy of _session for requests safe to repeat
+_RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+_RETRY_METHODS = frozenset(('GET', 'DELETE'))
+_RETRY_TOTAL = 3
+_RETRY_BACKOFF = 0.2
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying, honouring a Retry-After given in seconds."""
+    retry_after = response.headers.get('Retry-After', '')
+    if retry_after.isdigit():
+        return float(retry_after)
+    return _RETRY_BACKOFF * 2 ** attempt
+
+
+def _query_options(batch_size: Optional[int]) -> Optional[dict]:
+    """Headers asking Salesforce for query pages of about batch_size records."""
+    if batch_size is None:
+        return None
+    # Salesforce only honours batch sizes between 200 and 2000
+    return {'Sforce-Query-Options': f'batchSize={min(max(batch_size, 200), 2000)}'}
+
+
+class AsyncSalesforce:
+    """Non-blocking Salesforce REST client using the access token of a simple_salesforce login."""
+
+    def __init__(self, sf: Salesforce):
+        # The blocking client stays available for APIs not wrapped here, such as Bulk 2.0
+        self.sync = sf
+        self.sf_instance = sf.sf_instance
+        self.base_url = sf.base_url
+        self.apex_url = sf.apex_url
+        self.headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {sf.session_id}',
+        }
+
+    @staticmethod
+    async def _send(method: str, url: Any, headers: dict, content: Optional[bytes], stream: bool, **kwargs) -> httpx.Response:
+        """Send a request, retrying GET and DELETE while Salesforce answers with a transient error status."""
+        for attempt in range(_RETRY_TOTAL + 1):
+            request = _http.build_request(method, url, headers=headers, content=content, **kwargs)
+            response = await _http.send(request, stream=stream)
+            if response.status_code not in _RETRY_STATUSES or method not in _RETRY_METHODS or attempt == _RETRY_TOTAL:
+                return response
+            await response.aclose()
+            await asyncio.sleep(_retry_delay(response, attempt))
+
+    async def _request(self, method: str, url: Any, name: str, json: Any = None, headers: Optional[dict] = None, stream: bool = False, **kwargs) -> httpx.Response:
+        content = orjson.dumps(json) if json is not None else None
+        response = await self._send(method, url, {**self.headers, **(headers or {})}, content, stream, **kwargs)
+        if response.status_code == 401:
+            # The access token expired; log in again and retry once with the new one
+            await response.aclose()
+            sf = await _reauthenticate(self)
+            response = await self._send(method, url, {**sf.headers, **(headers or {})}, content, stream, **kwargs)
+        # 304 only comes back for conditional requests, which handle it themselves
+        if response.status_code >= 300 and response.status_code != 304:
+            await response.aread()
+            exception_handler(response, name=name)
+        return response
+
+    async def restful(self, path: str, method: str = 'GET', params: Optional[dict] = None, json: Any = None, headers: Optional[dict] = None) -> Optional[Any]:
+        """Call a REST API path relative to the versioned data endpoint."""
+        response = await self._request(method, self.base_url + path, path, json=json, headers=headers, params=params)
+        if response.status_code == 204 or not response.content:
+            return None
+        return orjson.loads(response.content)
+
+    async def sobject(self, method: str, object_name: str, path: str = '', json: Any = None) -> Optional[Any]:
+        """Call the sObject resource of an object type, or a sub-path of it such as a record Id."""
+        return await self.restful(f'sobjects/{object_name}/{path}', method=method, json=json)
+
+    async def describe_if_modified(self, object_name: str, since: Optional[str]) -> tuple[Optional[dict], str]:
+        """Describe an object unless its metadata is unchanged since the given HTTP date.
+
+        Returns the describe result, or None when unchanged, along with the date to pass as
+        `since` on the next call.
+        """
+        path = f'sobjects/{object_name}/describe/'
+        headers = {'If-Modified-Since': since} if since else None
+        response = await self._request('GET', self.base_url + path, path, headers=headers)
+        seen_at = response.headers.get('Date') or formatdate(usegmt=True)
+        if response.status_code == 304:
+            return None, seen_at
+        return orjson.loads(response.content), seen_at
+
+    async def query(self, query: str, batch_size: Optional[int] = None) -> dict:
+        """Run a SOQL query, asking for pages of about batch_size records when given."""
+        return await self.restful('query/', params={'q': query}, headers=_query_options(batch_size))
+
+    def _next_records_url(self, next_records_url: str) -> httpx.URL:
+        """Build the URL of a further query page, keeping requests on this Salesforce instance.
+
+        The path may come from a tool caller, and every request carries the access token, so only
+        data API paths are accepted and the host is never taken from the path.
+        """
+        if not next_records_url.startswith('/services/data/') or any(part in next_records_url for part in ('@', '\\', '//')):
+            raise ToolError(f"Invalid nextRecordsUrl: {next_records_url}")
+        return httpx.URL(scheme='https', host=self.sf_instance, raw_path=next_records_url.encode())
+
+    async def query_more(self, next_records_url: str) -> dict:
+        response = await self._request('GET', self._next_records_url(next_records_url), 'query_more')
+        return orjson.loads(response.content)
+
+    async def query_pages(self, query: str, next_records_url: Optional[str] = None, batch_size: Optional[int] = None) -> AsyncIterator[dict]:
+        """Yield the result pages of a SOQL query, fetching further pages only as they are consumed.
+
+        When next_records_url is given, the query is resumed from that page instead of being run.
+        """
+        if next_records_url:
+            result = await self.query_more(next_records_url)
+        else:
+            result = await self.query(query, batch_size)
+        while True:
+            yield result
+            if result['done']:
+                return
+            result = await self.query_more(result['nextRecordsUrl'])
+
+    def query_stream(self, query: str, max_records: int, next_records_url: Optional[str] = None) -> "QueryStream":
+        """Iterate over the records of a SOQL query as they are parsed from each response body."""
+        return QueryStream(self, query, max_records, next_records_url)
+
+    async def apexecute(self, action: str, method: str = 'GET', data: Optional[dict] = None) -> Any:
+        response = await self._request(method, self.apex_url + action, 'apexecute', json=data)
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            return response.text
+
+
+_PAGE_FIELDS = frozenset(('totalSize', 'done', 'nextRecordsUrl'))
+
+
+class _QueryPageSink:
+    """Collects the records and page fields of one query response from a single stream of ijson events."""
+
+    def __init__(self):
+        self.page: dict = {}
+        self.records: list[dict] = []
+        self._builder: Optional[ijson.ObjectBuilder] = None
+
+    def send(self, event: tuple[str, str, Any]) -> None:
+        prefix, name, value = event
+        if prefix == 'records.item' or prefix.startswith('records.item.'):
+            if self._builder is None:
+                self._builder = ijson.ObjectBuilder()
+            self._builder.event(name, value)
+            if prefix == 'records.item' and name == 'end_map':
+                self.records.append(self._builder.value)
+                self._builder = None
+        elif prefix in _PAGE_FIELDS:
+            self.page[prefix] = value
+
+
+class QueryStream:
+    """The records of a SOQL query, parsed from each response body while it is being received.
+
+    Pages are requested one after another until max_records records have been read, always
+    finishing the page in progress so that its nextRecordsUrl resumes right after the last
+    record. Once iteration ends, page holds the totalSize, done and nextRecordsUrl of the last
+    page read.
+    """
+
+    def __init__(self, sf: AsyncSalesforce, query: str, max_records: int, next_records_url: Optional[str] = None):
+        self.sf = sf
+        self.query = query
+        self.max_records = max_records
+        self.next_records_url = next_records_url
+        self.page: dict = {}
+
+    async def __aiter__(self) -> AsyncIterator[dict]:
+        sf = self.sf
+        if self.next_records_url:
+            url, params, headers = sf._next_records_url(self.next_records_url), None, None
+        else:
+            url, params, headers = sf.base_url + 'query/', {'q': self.query}, _query_options(self.max_records)
+        read = 0
+        while True:
+            sink = _QueryPageSink()
+            parser = ijson.parse_coro(sink, use_float=True)
+            response = await sf._request('GET', url, 'query', headers=headers, params=params, stream=True)
+            try:
+                async for chunk in response.aiter_bytes():
+                    parser.send(chunk)
+                    for record in sink.records:
+                        yield record
+                    read += len(sink.records)
+                    sink.records.clear()
+            finally:
+                await response.aclose()
+            parser.close()
+            for record in sink.records:
+                yield record
+            read += len(sink.records)
+
+            self.page = sink.page
+            if sink.page['done'] or read >= self.max_records:
+                return
+            url, params, headers = sf._next_records_url(sink.page['nextRecordsUrl']), None, None
+
+
+async def _reauthenticate(stale: AsyncSalesforce) -> AsyncSalesforce:
+    """Replace a client whose access token was rejected, unless another call already did."""
+    global _sf_client
+    if _sf_client is stale:
+        _sf_client = None
+    return await get_salesforce_client()
+
+
+async def get_salesforce_client() -> AsyncSalesforce:
+    """Return the shared Salesforce client, authenticating on first use."""
+    global _sf_client
+    sf = _sf_client
+    if sf is not None:
+        return sf
+
+    async with _sf_lock:
+        if _sf_client is not None:
+            return _sf_client
+
+        if not _CONSUMER_KEY:
+            raise ToolError("SFDC_CLIENT_ID environment variable is required")
+        if not _CONSUMER_SECRET:
+            raise ToolError("SFDC_CLIENT_SECRET environment variable is required")
+
+        # The OAuth login is blocking, so keep it off the event loop
+        sf = AsyncSalesforce(await asyncio.to_thread(
+            Salesforce,
+            consumer_key=_CONSUMER_KEY,
+            consumer_secret=_CONSUMER_SECRET,
+            domain=_DOMAIN,
+            session=_session,
+        ))
+        _sf_client = sf
+        return sf
 
 
-def get_salesforce_client() -> Salesforce:
-    """Create and return a Salesforce client using environment variables."""
-    consumer_key = os.environ.get('SFDC_CLIENT_ID')
-    consumer_secret = os.environ.get('SFDC_CLIENT_SECRET')
-    domain = os.environ.get('SFDC_DOMAIN', 'organization.my')
-    
-    if not consumer_key:
-        raise ToolError("SFDC_CLIENT_ID environment variable is required")
-    if not consumer_secret:
-        raise ToolError("SFDC_CLIENT_SECRET environment variable is required")
-    
-    return Salesforce(
-        consumer_key=consumer_key,
-        consumer_secret=consumer_secret,
-        domain=domain
-    )
\ No newline at end of file
+async def close_salesforce_client() -> None:
+    """Drop the shared Salesforce client and close the pooled async HTTP connections."""
+    global _sf_client
+    _sf_client = None
+    await _http.aclose()
@@ -1,172 +1,247 @@
-import json
-from typing import Annotated, Optional
-
+import asyncio
+import csv
+import functools
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from typing import Annotated, Any, Literal, Optional
+
+import orjson
+from cachetools import LRUCache, TTLCache
 from fastmcp import FastMCP
 from fastmcp.exceptions import ToolError
 from pydantic import Field
+from simple_salesforce import Salesforce
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import Response
+
+from .client import AsyncSalesforce, close_salesforce_client, get_salesforce_client
+
+
+def _serialize_tool_result(data: Any) -> str:
+    """Encode tool results with orjson rather than FastMCP's default serializer."""
+    return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
 
-from .client import get_salesforce_client
 
 mcp = FastMCP(
     name="SalesforceMCP",
+    tool_serializer=_serialize_tool_result,
     on_duplicate_tools="error",
     on_duplicate_resources="warn",
     on_duplicate_prompts="replace",
 )
 
 
+def sf_tool(name: str, action: Optional[str] = None, description: Optional[str] = None):
+    """Register a tool, reporting any unexpected error as a ToolError.
+
+    The message reads "Failed to <action>: <error>", where action defaults to the tool name
+    with underscores replaced by spaces.
+    """
+    action = action or name.replace("_", " ")
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await fn(*args, **kwargs)
+            except ToolError:
+                raise
+            except Exception as e:
+                raise ToolError(f"Failed to {action}: {e}")
+
+        return mcp.tool(wrapper, name=name, description=description)
+
+    return decorator
+
+
+# Built once at import; the probe response never changes
+_HEALTH = Response(b'{"status":"healthy"}', media_type="application/json", headers={"Cache-Control": "no-store"})
+
+
 @mcp.custom_route("/health", methods=["GET"])
 async def health_check(request: Request):
-    return JSONResponse({"status": "healthy"})
+    return _HEALTH
+
+
+_field_attributes = itemgetter('name', 'label', 'type', 'nillable', 'createable', 'updateable')
+
+# Object schemas rarely change, so keep the projected describe() output for 15 minutes
+_schema_cache: TTLCache = TTLCache(maxsize=32, ttl=900)
+# Last describe date and result per object, used to revalidate expired schemas conditionally.
+# Bounded as well, since get_schema accepts any object type and each schema can be large
+_schema_last_seen: LRUCache = LRUCache(maxsize=64)
+
+
+async def _build_schema(sf: AsyncSalesforce, object_name: str) -> dict:
+    """Return the field schema for a Salesforce object, describing it only on a cache miss."""
+    key = (sf.sf_instance, object_name)
+    cached = _schema_cache.get(key)
+    if cached is not None:
+        # Mark the entry used in _schema_last_seen too, so a schema served from the cache is not
+        # evicted there while it stays here
+        _schema_last_seen.get(key)
+        return cached
+
+    since, previous = _schema_last_seen.get(key, (None, None))
+    schema, seen_at = await sf.describe_if_modified(object_name, since)
+    if schema is None:
+        _schema_cache[key] = previous
+        _schema_last_seen[key] = (seen_at, previous)
+        return previous
+
+    # One list per attribute rather than one dict per field; far fewer objects to build and encode
+    names, labels, types, required, createable, updateable, picklists = [], [], [], [], [], [], []
+    for field in schema['fields']:
+        name, label, field_type, nillable, can_create, can_update = _field_attributes(field)
+        names.append(name)
+        labels.append(label)
+        types.append(field_type)
+        required.append(not nillable)
+        createable.append(can_create)
+        updateable.append(can_update)
+        picklists.append(field.get('picklistValues', []))
+    fields = {
+        'name': names,
+        'label': labels,
+        'type': types,
+        'required': required,
+        'createable': createable,
+        'updateable': updateable,
+        'picklistValues': picklists,
+    }
+    schema = {"object": object_name, "fields": fields}
+    # Lets clients that already hold this schema skip receiving it again (see get_schema)
+    etag = hashlib.blake2b(orjson.dumps(schema), digest_size=16).hexdigest()
+    result = {"schema": schema, "etag": etag}
+    _schema_cache[key] = result
+    _schema_last_seen[key] = (seen_at, result)
+    return result
+
+
+def _describe_tool(object_name: str):
+    """Register the describe_<object>_schema tool for a Salesforce object."""
+    label = object_name.lower()
+    article = "an" if label[0] in "aeiou" else "a"
+
+    async def describe_schema() -> dict:
+        sf = await get_salesforce_client()
+        return await _build_schema(sf, object_name)
+
+    return sf_tool(
+        f"describe_{label}_schema",
+        description=f"Describes the available fields for {article} {label} object in Salesforce. Fields are returned as parallel lists, one per attribute.",
+    )(describe_schema)
+
+
+def _ok(record_id: str) -> dict:
+    """Result of a write whose only outcome worth reporting is that it succeeded."""
+    return {"ok": True, "id": record_id}
+
+
+def _batch_result(results: list[dict]) -> dict:
+    """Summarize sObject Collections results, keeping the errors of records that failed."""
+    response = {
+        "ok": all(result['success'] for result in results),
+        "ids": [result.get('id') for result in results],
+    }
+    errors = [
+        {"index": index, "errors": result['errors']}
+        for index, result in enumerate(results)
+        if not result['success']
+    ]
+    if errors:
+        response["errors"] = errors
+    return response
 
 
-@mcp.tool(name="describe_contact_schema")
-async def describe_contact_schema() -> dict:
-    """Describes the available fields for a contact object in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        schema = sf.Contact.describe()
-        fields = []
-        for field in schema['fields']:
-            fields.append({
-                'name': field['name'],
-                'label': field['label'],
-                'type': field['type'],
-                'required': field['nillable'] == False,
-                'createable': field['createable'],
-                'updateable': field['updateable'],
-                'picklistValues': field.get('picklistValues', [])
-            })
-        return {"schema": {"object": "Contact", "fields": fields}}
-    except Exception as e:
-        raise ToolError(f"Failed to describe contact schema: {e}")
-
-
-@mcp.tool(name="create_contact")
+async def _create(object_name: str, data: dict[str, Any]) -> dict:
+    """Create a record of the given object type."""
+    sf = await get_salesforce_client()
+    result = await sf.sobject('POST', object_name, json=data)
+    return {"message": f"{object_name} created successfully with Id: {result['id']}", "id": result['id']}
+
+
+async def _update(object_name: str, record_id: str, data: dict[str, Any]) -> dict:
+    """Update a record of the given object type."""
+    sf = await get_salesforce_client()
+    await sf.sobject('PATCH', object_name, record_id, json=data)
+    return _ok(record_id)
+
+
+async def _delete(object_name: str, record_id: str) -> dict:
+    """Delete a record of the given object type."""
+    sf = await get_salesforce_client()
+    await sf.sobject('DELETE', object_name, record_id)
+    return _ok(record_id)
+
+
+describe_contact_schema = _describe_tool("Contact")
+
+
+@sf_tool("create_contact")
 async def create_contact(
     contact: Annotated[
-        str, Field(description="A JSON-formatted string containing the contact fields to use for the new contact")
+        dict[str, Any], Field(description="An object containing the contact fields to use for the new contact")
     ]
 ) -> dict:
     """Create a new contact in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        contact_data = json.loads(contact)
-        result = sf.Contact.create(contact_data)
-        return {"message": f"Contact created successfully with Id: {result['id']}", "id": result['id']}
-    except json.JSONDecodeError:
-        raise ToolError("Invalid JSON provided for contact data")
-    except Exception as e:
-        raise ToolError(f"Failed to create contact: {e}")
+    return await _create("Contact", contact)
 
 
-@mcp.tool(name="update_contact")
+@sf_tool("update_contact")
 async def update_contact(
     contact: Annotated[
-        str, Field(description="A JSON-formatted string containing the contact fields to update in the existing contact")
+        dict[str, Any], Field(description="An object containing the contact fields to update in the existing contact")
     ],
     contact_id: Annotated[str, Field(description="A string containing the Salesforce Id of the contact to update")]
 ) -> dict:
     """Update an existing contact in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        contact_data = json.loads(contact)
-        result = sf.Contact.update(contact_id, contact_data)
-        return {"message": f"Contact {contact_id} updated successfully"}
-    except json.JSONDecodeError:
-        raise ToolError("Invalid JSON provided for contact data")
-    except Exception as e:
-        raise ToolError(f"Failed to update contact: {e}")
+    return await _update("Contact", contact_id, contact)
 
 
-@mcp.tool(name="delete_contact")
+@sf_tool("delete_contact")
 async def delete_contact(
     contact_id: Annotated[str, Field(description="A string containing the Salesforce Id of the contact to delete")]
 ) -> dict:
     """Delete an existing contact in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        result = sf.Contact.delete(contact_id)
-        return {"message": f"Contact {contact_id} deleted successfully"}
-    except Exception as e:
-        raise ToolError(f"Failed to delete contact: {e}")
+    return await _delete("Contact", contact_id)
 
 
-@mcp.tool(name="describe_lead_schema")
-async def describe_lead_schema() -> dict:
-    """Describes the available fields for a lead object in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        schema = sf.Lead.describe()
-        fields = []
-        for field in schema['fields']:
-            fields.append({
-                'name': field['name'],
-                'label': field['label'],
-                'type': field['type'],
-                'required': field['nillable'] == False,
-                'createable': field['createable'],
-                'updateable': field['updateable'],
-                'picklistValues': field.get('picklistValues', [])
-            })
-        return {"schema": {"object": "Lead", "fields": fields}}
-    except Exception as e:
-        raise ToolError(f"Failed to describe lead schema: {e}")
-
-
-@mcp.tool(name="create_lead")
+describe_lead_schema = _describe_tool("Lead")
+
+
+@sf_tool("create_lead")
 async def create_lead(
     lead: Annotated[
-        str, Field(description="A JSON-formatted string containing the lead fields to use for the new lead")
+        dict[str, Any], Field(description="An object containing the lead fields to use for the new lead")
     ]
 ) -> dict:
     """Create a new lead in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        lead_data = json.loads(lead)
-        result = sf.Lead.create(lead_data)
-        return {"message": f"Lead created successfully with Id: {result['id']}", "id": result['id']}
-    except json.JSONDecodeError:
-        raise ToolError("Invalid JSON provided for lead data")
-    except Exception as e:
-        raise ToolError(f"Failed to create lead: {e}")
+    return await _create("Lead", lead)
 
 
-@mcp.tool(name="update_lead")
+@sf_tool("update_lead")
 async def update_lead(
     lead: Annotated[
-        str, Field(description="A JSON-formatted string containing the lead fields to update in the existing lead")
+        dict[str, Any], Field(description="An object containing the lead fields to update in the existing lead")
     ],
     lead_id: Annotated[str, Field(description="A string containing the Salesforce Id of the lead to update")]
 ) -> dict:
     """Update an existing lead in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        lead_data = json.loads(lead)
-        result = sf.Lead.update(lead_id, lead_data)
-        return {"message": f"Lead {lead_id} updated successfully"}
-    except json.JSONDecodeError:
-        raise ToolError("Invalid JSON provided for lead data")
-    except Exception as e:
-        raise ToolError(f"Failed to update lead: {e}")
+    return await _update("Lead", lead_id, lead)
 
 
-@mcp.tool(name="delete_lead")
+@sf_tool("delete_lead")
 async def delete_lead(
     lead_id: Annotated[str, Field(description="A string containing the Salesforce Id of the lead to delete")]
 ) -> dict:
     """Delete an existing lead in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        result = sf.Lead.delete(lead_id)
-        return {"message": f"Lead {lead_id} deleted successfully"}
-    except Exception as e:
-        raise ToolError(f"Failed to delete lead: {e}")
+    return await _delete("Lead", lead_id)
 
 
-@mcp.tool(name="convert_lead_to_opportunity")
+@sf_tool("convert_lead_to_opportunity")
 async def convert_lead_to_opportunity(
     lead_id: Annotated[str, Field(description="A string containing the Salesforce Id of the lead to update")],
     converted_status: Annotated[str, Field(description="The converted status of the lead. Must exist within Salesforce.")],
@@ -175,290 +250,292 @@ async def convert_lead_to_opportunity(
     contact_id: Annotated[Optional[str], Field(description="The Salesforce Id of an existing contact to associate with the opportunity")] = None,
 ) -> dict:
     """Converts an existing lead into a new Opportunity in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        
-        convert_data = {
-            'leadId': lead_id,
-            'convertedStatus': converted_status,
-            'opportunityName': opportunity_name
-        }
+    sf = await get_salesforce_client()
+    
+    convert_data = {
+        'leadId': lead_id,
+        'convertedStatus': converted_status,
+        'opportunityName': opportunity_name
+    }
+    
+    if account_id:
+        convert_data['accountId'] = account_id
+    if contact_id:
+        convert_data['contactId'] = contact_id
         
-        if account_id:
-            convert_data['accountId'] = account_id
-        if contact_id:
-            convert_data['contactId'] = contact_id
-            
-        result = sf.apexecute('apex/ConvertLead', method='POST', data=convert_data)
-        return {"message": f"Lead {lead_id} converted successfully to opportunity: {opportunity_name}"}
-    except Exception as e:
-        raise ToolError(f"Failed to convert lead to opportunity: {e}")
-
-
-@mcp.tool(name="describe_account_schema")
-async def describe_account_schema() -> dict:
-    """Describes the available fields for an account object in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        schema = sf.Account.describe()
-        fields = []
-        for field in schema['fields']:
-            fields.append({
-                'name': field['name'],
-                'label': field['label'],
-                'type': field['type'],
-                'required': field['nillable'] == False,
-                'createable': field['createable'],
-                'updateable': field['updateable'],
-                'picklistValues': field.get('picklistValues', [])
-            })
-        return {"schema": {"object": "Account", "fields": fields}}
-    except Exception as e:
-        raise ToolError(f"Failed to describe account schema: {e}")
-
-
-@mcp.tool(name="create_account")
+    result = await sf.apexecute('apex/ConvertLead', method='POST', data=convert_data)
+    return {"message": f"Lead {lead_id} converted successfully to opportunity: {opportunity_name}"}
+
+
+describe_account_schema = _describe_tool("Account")
+
+
+@sf_tool("create_account")
 async def create_account(
     account: Annotated[
-        str, Field(description="A JSON-formatted string containing the account fields to use for the new account")
+        dict[str, Any], Field(description="An object containing the account fields to use for the new account")
     ]
 ) -> dict:
     """Create a new account in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        account_data = json.loads(account)
-        result = sf.Account.create(account_data)
-        return {"message": f"Account created successfully with Id: {result['id']}", "id": result['id']}
-    except json.JSONDecodeError:
-        raise ToolError("Invalid JSON provided for account data")
-    except Exception as e:
-        raise ToolError(f"Failed to create account: {e}")
+    return await _create("Account", account)
 
 
-@mcp.tool(name="update_account")
+@sf_tool("update_account")
 async def update_account(
     account: Annotated[
-        str, Field(description="A JSON-formatted string containing the account fields to update in the existing account")
+        dict[str, Any], Field(description="An object containing the account fields to update in the existing account")
     ],
     account_id: Annotated[str, Field(description="A string containing the Salesforce Id of the account to update")]
 ) -> dict:
     """Update an existing account in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        account_data = json.loads(account)
-        result = sf.Account.update(account_id, account_data)
-        return {"message": f"Account {account_id} updated successfully"}
-    except json.JSONDecodeError:
-        raise ToolError("Invalid JSON provided for account data")
-    except Exception as e:
-        raise ToolError(f"Failed to update account: {e}")
+    return await _update("Account", account_id, account)
 
 
-@mcp.tool(name="delete_account")
+@sf_tool("delete_account")
 async def delete_account(
     account_id: Annotated[str, Field(description="A string containing the Salesforce Id of the account to delete")]
 ) -> dict:
     """Delete an existing account in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        result = sf.Account.delete(account_id)
-        return {"message": f"Account {account_id} deleted successfully"}
-    except Exception as e:
-        raise ToolError(f"Failed to delete account: {e}")
+    return await _delete("Account", account_id)
 
 
-@mcp.tool(name="describe_opportunity_schema")
-async def describe_opportunity_schema() -> dict:
-    """Describes the available fields for an opportunity object in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        schema = sf.Opportunity.describe()
-        fields = []
-        for field in schema['fields']:
-            fields.append({
-                'name': field['name'],
-                'label': field['label'],
-                'type': field['type'],
-                'required': field['nillable'] == False,
-                'createable': field['createable'],
-                'updateable': field['updateable'],
-                'picklistValues': field.get('picklistValues', [])
-            })
-        return {"schema": {"object": "Opportunity", "fields": fields}}
-    except Exception as e:
-        raise ToolError(f"Failed to describe opportunity schema: {e}")
-
-
-@mcp.tool(name="create_opportunity")
+describe_opportunity_schema = _describe_tool("Opportunity")
+
+
+@sf_tool("create_opportunity")
 async def create_opportunity(
     opportunity: Annotated[
-        str, Field(description="A JSON-formatted string containing the opportunity fields to use for the new opportunity")
+        dict[str, Any], Field(description="An object containing the opportunity fields to use for the new opportunity")
     ]
 ) -> dict:
     """Create a new opportunity in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        opportunity_data = json.loads(opportunity)
-        result = sf.Opportunity.create(opportunity_data)
-        return {"message": f"Opportunity created successfully with Id: {result['id']}", "id": result['id']}
-    except json.JSONDecodeError:
-        raise ToolError("Invalid JSON provided for opportunity data")
-    except Exception as e:
-        raise ToolError(f"Failed to create opportunity: {e}")
+    return await _create("Opportunity", opportunity)
 
 
-@mcp.tool(name="update_opportunity")
+@sf_tool("update_opportunity")
 async def update_opportunity(
     opportunity: Annotated[
-        str, Field(description="A JSON-formatted string containing the opportunity fields to update in the existing opportunity")
+        dict[str, Any], Field(description="An object containing the opportunity fields to update in the existing opportunity")
     ],
     opportunity_id: Annotated[str, Field(description="A string containing the Salesforce Id of the opportunity to update")]
 ) -> dict:
     """Update an existing opportunity in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        opportunity_data = json.loads(opportunity)
-        result = sf.Opportunity.update(opportunity_id, opportunity_data)
-        return {"message": f"Opportunity {opportunity_id} updated successfully"}
-    except json.JSONDecodeError:
-        raise ToolError("Invalid JSON provided for opportunity data")
-    except Exception as e:
-        raise ToolError(f"Failed to update opportunity: {e}")
+    return await _update("Opportunity", opportunity_id, opportunity)
 
 
-@mcp.tool(name="delete_opportunity")
+@sf_tool("delete_opportunity")
 async def delete_opportunity(
     opportunity_id: Annotated[str, Field(description="A string containing the Salesforce Id of the opportunity to delete")]
 ) -> dict:
     """Delete an existing opportunity in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        result = sf.Opportunity.delete(opportunity_id)
-        return {"message": f"Opportunity {opportunity_id} deleted successfully"}
-    except Exception as e:
-        raise ToolError(f"Failed to delete opportunity: {e}")
+    return await _delete("Opportunity", opportunity_id)
 
 
-@mcp.tool(name="describe_case_schema")
-async def describe_case_schema() -> dict:
-    """Describes the available fields for a case object in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        schema = sf.Case.describe()
-        fields = []
-        for field in schema['fields']:
-            fields.append({
-                'name': field['name'],
-                'label': field['label'],
-                'type': field['type'],
-                'required': field['nillable'] == False,
-                'createable': field['createable'],
-                'updateable': field['updateable'],
-                'picklistValues': field.get('picklistValues', [])
-            })
-        return {"schema": {"object": "Case", "fields": fields}}
-    except Exception as e:
-        raise ToolError(f"Failed to describe case schema: {e}")
-
-
-@mcp.tool(name="create_case")
+describe_case_schema = _describe_tool("Case")
+
+
+@sf_tool("create_case")
 async def create_case(
     case: Annotated[
-        str, Field(description="A JSON-formatted string containing the case fields to use for the new case")
+        dict[str, Any], Field(description="An object containing the case fields to use for the new case")
     ]
 ) -> dict:
     """Create a new case in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        case_data = json.loads(case)
-        result = sf.Case.create(case_data)
-        return {"message": f"Case created successfully with Id: {result['id']}", "id": result['id']}
-    except json.JSONDecodeError:
-        raise ToolError("Invalid JSON provided for case data")
-    except Exception as e:
-        raise ToolError(f"Failed to create case: {e}")
+    return await _create("Case", case)
 
 
-@mcp.tool(name="update_case")
+@sf_tool("update_case")
 async def update_case(
     case: Annotated[
-        str, Field(description="A JSON-formatted string containing the case fields to update in the existing case")
+        dict[str, Any], Field(description="An object containing the case fields to update in the existing case")
     ],
     case_id: Annotated[str, Field(description="A string containing the Salesforce Id of the case to update")]
 ) -> dict:
     """Update an existing case in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        case_data = json.loads(case)
-        result = sf.Case.update(case_id, case_data)
-        return {"message": f"Case {case_id} updated successfully"}
-    except json.JSONDecodeError:
-        raise ToolError("Invalid JSON provided for case data")
-    except Exception as e:
-        raise ToolError(f"Failed to update case: {e}")
+    return await _update("Case", case_id, case)
 
 
-@mcp.tool(name="delete_case")
+@sf_tool("delete_case")
 async def delete_case(
     case_id: Annotated[str, Field(description="A string containing the Salesforce Id of the case to delete")]
 ) -> dict:
     """Delete an existing case in Salesforce."""
-    try:
-        sf = get_salesforce_client()
-        result = sf.Case.delete(case_id)
-        return {"message": f"Case {case_id} deleted successfully"}
-    except Exception as e:
-        raise ToolError(f"Failed to delete case: {e}")
+    return await _delete("Case", case_id)
+
+
+@sf_tool("list_schemas")
+async def list_schemas() -> dict:
+    """Lists the Salesforce object schemas the server currently holds, with their ETags, without contacting Salesforce. ETags of schemas marked expired may change on the next describe."""
+    held = {key: result for key, (_, result) in _schema_last_seen.items()}
+    held.update(_schema_cache.items())
+    schemas = [
+        {"object": key[1], "etag": result["etag"], "expired": key not in _schema_cache}
+        for key, result in held.items()
+    ]
+    return {"schemas": schemas}
+
+
+@sf_tool("get_schema")
+async def get_schema(
+    object_type: Annotated[str, Field(description="The type of Salesforce object to describe. Use the API name, starting with a capital letter (e.g., Account, Contact, Lead, Opportunity, Case, Task)")],
+    etag: Annotated[Optional[str], Field(description="The ETag of a copy of this schema you already have. If it is still current, the fields are not sent again.")] = None,
+) -> dict:
+    """Describes the available fields for any Salesforce object, as parallel lists per attribute, omitting them when the given ETag is still current."""
+    sf = await get_salesforce_client()
+    result = await _build_schema(sf, object_type)
+    if etag is not None and etag == result["etag"]:
+        return {"object": object_type, "etag": etag, "notModified": True}
+    return result
+
+
+_COMPOSITE_BATCH_LIMIT = 200
+
 
+def _composite_records(object_type: str, records: list[dict[str, Any]]) -> dict:
+    """Build an sObject Collections request body for records of one object type."""
+    return {
+        "allOrNone": False,
+        "records": [{"attributes": {"type": object_type}, **record} for record in records],
+    }
 
-@mcp.tool(name="query")
+
+@sf_tool("batch_create", action="batch create records")
+async def batch_create(
+    object_type: Annotated[str, Field(description="The type of Salesforce object to create. Use singular form, starting with a capital letter (e.g., Account, Contact, Lead, Opportunity, Case)")],
+    records: Annotated[
+        list[dict[str, Any]], Field(description="Up to 200 objects, each containing the fields to use for one new record", min_length=1, max_length=_COMPOSITE_BATCH_LIMIT)
+    ]
+) -> dict:
+    """Create up to 200 records of one object type in a single Salesforce request."""
+    sf = await get_salesforce_client()
+    results = await sf.restful('composite/sobjects', method='POST', json=_composite_records(object_type, records))
+    return _batch_result(results)
+
+
+@sf_tool("batch_update", action="batch update records")
+async def batch_update(
+    object_type: Annotated[str, Field(description="The type of Salesforce object to update. Use singular form, starting with a capital letter (e.g., Account, Contact, Lead, Opportunity, Case)")],
+    records: Annotated[
+        list[dict[str, Any]], Field(description="Up to 200 objects, each containing the Salesforce Id of an existing record and the fields to update in it", min_length=1, max_length=_COMPOSITE_BATCH_LIMIT)
+    ]
+) -> dict:
+    """Update up to 200 existing records of one object type in a single Salesforce request."""
+    sf = await get_salesforce_client()
+    results = await sf.restful('composite/sobjects', method='PATCH', json=_composite_records(object_type, records))
+    return _batch_result(results)
+
+
+@sf_tool("refresh_schema")
+async def refresh_schema(
+    object_type: Annotated[Optional[str], Field(description="The Salesforce object whose cached schema should be discarded (e.g., Account, Contact, Lead, Opportunity, Case). Discards all cached schemas when omitted.")] = None
+) -> dict:
+    """Discard cached Salesforce object schemas so the next describe call fetches them again."""
+    if object_type is None:
+        _schema_cache.clear()
+        _schema_last_seen.clear()
+        return {"message": "All cached schemas discarded"}
+
+    for key in [key for key in {*_schema_cache, *_schema_last_seen} if key[1] == object_type]:
+        _schema_cache.pop(key, None)
+        _schema_last_seen.pop(key, None)
+    return {"message": f"Cached {object_type} schema discarded"}
+
+
+def _bulk_query_csv(sf: Salesforce, query: str, max_records: int) -> tuple[str, int, bool]:
+    """Run a SOQL query as a Bulk API 2.0 job and return its result pages as one CSV document.
+
+    Pages of up to max_records rows are read until max_records rows have been collected. Returns
+    the CSV text, its row count, and False when reading stopped at that limit, in which case more
+    rows may remain.
+    """
+    # A query job is defined by its SOQL alone; the object name of the bulk2 handle is never sent
+    pages = sf.bulk2.SObject.query(query, max_records=max_records)
+    parts = []
+    rows = 0
+    for page in pages:
+        rows += max(sum(1 for _ in csv.reader(io.StringIO(page))) - 1, 0)
+        # Every results page repeats the CSV header, so keep it only from the first page
+        parts.append(page.partition("\n")[2] if parts else page)
+        if rows >= max_records:
+            return "".join(parts), rows, False
+    return "".join(parts), rows, True
+
+
+def _page_result(page: dict, **content: Any) -> dict:
+    """Build the query tool response for the content read up to and including the given page."""
+    response = {
+        "totalSize": page['totalSize'],
+        "done": page['done'],
+        **content
+    }
+
+    # Handle pagination
+    if not page['done'] and 'nextRecordsUrl' in page:
+        response['nextRecordsUrl'] = page['nextRecordsUrl']
+
+    return response
+
+
+@sf_tool("query", action="execute query")
 async def query(
-    query: Annotated[str, Field(description="The SOQL query to execute")]
+    query: Annotated[str, Field(description="The SOQL query to execute")],
+    stream: Annotated[bool, Field(description="Follow result pages lazily and return up to max_records records in one response instead of a single page")] = False,
+    max_records: Annotated[int, Field(description="The number of records after which stream, ndjson and csv modes stop requesting pages. Pages are returned whole so none are skipped when resuming, which can take the count past this limit.", ge=1)] = 2000,
+    next_records_url: Annotated[Optional[str], Field(description="The nextRecordsUrl returned by an earlier call with the same query, to continue from where it stopped")] = None,
+    format: Annotated[Literal["json", "csv", "ndjson"], Field(description="The result format. Use csv for large result sets; it runs the query as a Bulk API 2.0 job and returns up to max_records rows as CSV text, with done set to false when it stopped at that limit. Use ndjson to return up to max_records records as newline-delimited JSON, one record per line.")] = "json",
 ) -> dict:
     """Query Salesforce using SOQL."""
-    try:
-        sf = get_salesforce_client()
-        result = sf.query(query)
-        
+    sf = await get_salesforce_client()
+
+    if format == "csv":
+        data, rows, done = await asyncio.to_thread(_bulk_query_csv, sf.sync, query, max_records)
+        return {"format": "csv", "rows": rows, "done": done, "data": data}
+
+    if format == "ndjson":
+        # Encode records as they are parsed off the wire instead of collecting them in a list first
+        data = bytearray()
+        rows = 0
+        records = sf.query_stream(query, max_records, next_records_url)
+        async for record in records:
+            data += orjson.dumps(record)
+            data += b"\n"
+            rows += 1
+        return _page_result(records.page, format="ndjson", rows=rows, data=data.decode())
+
+    if stream:
+        # Pull pages only until max_records is reached, asking Salesforce for pages of about that size
         records = []
-        for record in result['records']:
-            records.append(record)
-            
-        response = {
-            "totalSize": result['totalSize'],
-            "done": result['done'],
-            "records": records
-        }
-        
-        # Handle pagination
-        if not result['done'] and 'nextRecordsUrl' in result:
-            response['nextRecordsUrl'] = result['nextRecordsUrl']
-            
-        return response
-    except Exception as e:
-        raise ToolError(f"Failed to execute query: {e}")
+        async for page in sf.query_pages(query, next_records_url, batch_size=max_records):
+            records.extend(page['records'])
+            if len(records) >= max_records:
+                break
+        return _page_result(page, records=records)
+
+    if next_records_url:
+        result = await sf.query_more(next_records_url)
+    else:
+        result = await sf.query(query)
+    return _page_result(result, records=result['records'])
+
 
+# The instance URL does not change for the life of the process, so resolve it once
+_base_url: Optional[str] = None
 
-@mcp.tool(name="get_direct_link")
+
+@sf_tool("get_direct_link")
 async def get_direct_link(
     object_type: Annotated[str, Field(description="The type of Salesforce object to get the direct link for. Use singular form, starting with a capital letter (e.g., Account, Contact, Lead, Opportunity, Case)")],
     object_id: Annotated[str, Field(description="The ID of the Salesforce object to get the direct link for.")]
 ) -> dict:
     """Get a direct weblink to a Salesforce object."""
-    try:
-        sf = get_salesforce_client()
-        # Extract the base URL from the instance URL
-        instance_url = sf.sf_instance
-        if not instance_url.startswith('https://'):
-            instance_url = f"https://{instance_url}"
-        
-        direct_url = f"{instance_url}/{object_id}"
-        return {"url": direct_url, "object_type": object_type, "object_id": object_id}
-    except Exception as e:
-        raise ToolError(f"Failed to get direct link: {e}")
+    global _base_url
+    if _base_url is None:
+        sf = await get_salesforce_client()
+        _base_url = f"https://{sf.sf_instance.removeprefix('https://')}"
+    return {"url": f"{_base_url}/{object_id}", "object_type": object_type, "object_id": object_id}
 
 
-@mcp.tool(name="email_message")
+@sf_tool("email_message", action="create email message")
 async def email_message(
     related_object_id: Annotated[str, Field(description="The Salesforce Id of the object to which the email should be related")],
     subject: Annotated[str, Field(description="The subject of the email")],
@@ -470,35 +547,41 @@ async def email_message(
     status: Annotated[int, Field(description="The numeric status of the email (3 = Sent, 5 = Draft). Create messages as drafts by default.")] = 5,
 ) -> dict:
     """Create an Email in Salesforce using Enhanced Email functionality."""
+    sf = await get_salesforce_client()
+    
+    email_data = {
+        'RelatedToId': related_object_id,
+        'Subject': subject,
+        'TextBody': text_body,
+        'HtmlBody': html_body,
+        'FromName': from_name,
+        'FromAddress': from_address,
+        'ToAddress': to_address,
+        'Status': status
+    }
+    
+    result = await sf.sobject('POST', 'EmailMessage', json=email_data)
+    status_text = "Draft" if status == 5 else "Sent" if status == 3 else "Unknown"
+    return {"message": f"Email message created successfully with Id: {result['id']} (Status: {status_text})", "id": result['id']}
+
+
+async def _serve():
+    # Blocking Salesforce calls are handed to the default executor with asyncio.to_thread
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=20))
     try:
-        sf = get_salesforce_client()
-        
-        email_data = {
-            'RelatedToId': related_object_id,
-            'Subject': subject,
-            'TextBody': text_body,
-            'HtmlBody': html_body,
-            'FromName': from_name,
-            'FromAddress': from_address,
-            'ToAddress': to_address,
-            'Status': status
-        }
-        
-        result = sf.EmailMessage.create(email_data)
-        status_text = "Draft" if status == 5 else "Sent" if status == 3 else "Unknown"
-        return {"message": f"Email message created successfully with Id: {result['id']} (Status: {status_text})", "id": result['id']}
-    except Exception as e:
-        raise ToolError(f"Failed to create email message: {e}")
+        await mcp.run_async(
+            transport="streamable-http",
+            host="0.0.0.0",
+            port=9000,
+            path="/",
+        )
+    finally:
+        await close_salesforce_client()
 
 
 def streamable_http_server():
     """Main entry point for the Salesforce MCP server."""
-    mcp.run(
-        transport="streamable-http",
-        host="0.0.0.0",
-        port=9000,
-        path="/",
-    )
+    asyncio.run(_serve())
 
 
 if __name__ == "__main__":
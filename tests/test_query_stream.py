@@ -0,0 +1,129 @@
+"""Tests for streaming SOQL results with AsyncSalesforce.query_stream."""
+import unittest
+from unittest import mock
+
+import httpx
+import orjson
+from fastmcp.exceptions import ToolError
+
+from app import client
+from app.client import AsyncSalesforce
+
+INSTANCE = 'na1.my.salesforce.com'
+NEXT_RECORDS_URL = '/services/data/v59.0/query/01gxx0000000001-3'
+
+# nextRecordsUrl follows the records here, so the page fields are only known once the body has been read
+FIRST_PAGE = {
+    'totalSize': 5,
+    'done': False,
+    'records': [
+        {
+            'attributes': {'type': 'Account', 'url': '/services/data/v59.0/sobjects/Account/001A'},
+            'Id': '001A',
+            'Name': 'Acme "West"\né',
+            'AnnualRevenue': 1.25,
+            'Owner': {'attributes': {'type': 'User'}, 'Name': 'records.item'},
+        },
+        {
+            'Id': '001B',
+            'Name': None,
+            'Contacts': {
+                'totalSize': 2,
+                'done': True,
+                'records': [{'Id': '003A', 'Tags': []}, {'Id': '003B', 'Tags': ['a', 'b']}],
+            },
+        },
+        {'Id': '001C', 'IsDeleted': True},
+    ],
+    'nextRecordsUrl': NEXT_RECORDS_URL,
+}
+SECOND_PAGE = {
+    'totalSize': 5,
+    'done': True,
+    'records': [{'Id': '001D'}, {'Id': '001E'}],
+}
+
+
+class _Login:
+    """Stands in for a simple_salesforce login."""
+
+    sf_instance = INSTANCE
+    base_url = f'https://{INSTANCE}/services/data/v59.0/'
+    apex_url = f'https://{INSTANCE}/services/apexrest/'
+    session_id = 'token'
+
+
+async def _chunks(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+class QueryStreamTest(unittest.IsolatedAsyncioTestCase):
+
+    def serve_pages(self, chunk_size: int = 1 << 20) -> list[httpx.Request]:
+        """Answer query requests with the two pages above, sending each body in chunks of chunk_size bytes."""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            page = SECOND_PAGE if request.url.path == NEXT_RECORDS_URL else FIRST_PAGE
+            return httpx.Response(200, content=_chunks(orjson.dumps(page), chunk_size))
+
+        http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        patcher = mock.patch.object(client, '_http', http)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addAsyncCleanup(http.aclose)
+        return requests
+
+    async def read(self, max_records: int, next_records_url: str = None) -> tuple[list[dict], dict]:
+        stream = AsyncSalesforce(_Login()).query_stream('SELECT Id FROM Account', max_records, next_records_url)
+        return [record async for record in stream], stream.page
+
+    async def test_records_split_across_chunks(self):
+        for chunk_size in (1, 3, 7, 64, 1 << 20):
+            with self.subTest(chunk_size=chunk_size):
+                self.serve_pages(chunk_size)
+                records, page = await self.read(max_records=2000)
+                self.assertEqual(records, FIRST_PAGE['records'] + SECOND_PAGE['records'])
+                self.assertEqual(page, {'totalSize': 5, 'done': True})
+
+    async def test_subquery_records_stay_nested(self):
+        self.serve_pages(chunk_size=5)
+        records, _ = await self.read(max_records=2000)
+        self.assertEqual([record['Id'] for record in records], ['001A', '001B', '001C', '001D', '001E'])
+        self.assertEqual(records[1]['Contacts'], FIRST_PAGE['records'][1]['Contacts'])
+
+    async def test_stops_at_the_end_of_the_page_reaching_max_records(self):
+        requests = self.serve_pages(chunk_size=7)
+        records, page = await self.read(max_records=2)
+        self.assertEqual(records, FIRST_PAGE['records'])
+        self.assertEqual(page, {'totalSize': 5, 'done': False, 'nextRecordsUrl': NEXT_RECORDS_URL})
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(requests[0].headers['Sforce-Query-Options'], 'batchSize=200')
+
+    async def test_resumes_from_next_records_url(self):
+        requests = self.serve_pages(chunk_size=7)
+        records, page = await self.read(max_records=2, next_records_url=NEXT_RECORDS_URL)
+        self.assertEqual(records, SECOND_PAGE['records'])
+        self.assertTrue(page['done'])
+        self.assertEqual(str(requests[0].url), f'https://{INSTANCE}{NEXT_RECORDS_URL}')
+
+    async def test_rejects_next_records_url_off_the_instance(self):
+        requests = self.serve_pages()
+        for next_records_url in (
+            '.evil.example.com/services/data/',
+            '@evil.example.com/services/data/',
+            'https://evil.example.com/services/data/',
+            '/services/data//evil.example.com/',
+            '/services/data/@evil.example.com/',
+            '/services/data/\\evil.example.com/',
+        ):
+            with self.subTest(next_records_url=next_records_url):
+                with self.assertRaises(ToolError):
+                    await self.read(max_records=2, next_records_url=next_records_url)
+        self.assertEqual(requests, [])
+
+
+if __name__ == '__main__':
+    unittest.main()